@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:31:08 2026
+
+Selection of the next stimulus intensity by the adaptive method shared by the
+lines GUI (LinesLengthJNDThreshold.py) and the user simulation
+(AdaptiveTest_UserSimulation.py).
+
+The stimulus intensity is chosen at random for the first trials. Afterwards a PF
+is fitted to the data collected so far and a stimulus intensity within a range
+around the threshold estimate is presented, which prevents the adaptive method
+from getting 'stuck' in the same value.
+
+Each adaptive track keeps its own data and fit. The user simulation runs a single
+track, while the GUI can interleave several independent tracks (e.g. lines of
+different width and separation) in the same session: the next track presented is
+chosen at random with a probability proportional to the expected reduction of the
+variance of its threshold estimate after another trial. Only the track that
+received the last response is fitted again, so the time per trial does not grow
+with the number of tracks (see TracksBenchmark).
+
+This module does not import matplotlib nor tkinter so it can be used without a
+display, e.g. in worker processes of simulations and bulk analysis.
+
+@author: Marina Torrente Rodriguez
+"""
+
+import random
+import time
+import numpy as np
+from MaxLikelihoodEstimation import MLE_search
+from PsychometricFunctionClass import PsychometricFunction
+
+# Number of stimulus levels at each side of the threshold estimate that can be presented
+StimSpread = 2
+
+
+def RandomStimIndex(StimLevels):
+
+    # Choose next stimulus intensity randomly
+    return random.choice(range(len(StimLevels)))
+
+
+def StimIndexAroundAlpha(StimLevels, alpha):
+
+    # Find stim level closest to alpha
+    diff = abs(StimLevels-alpha)
+    StimIndex = np.unravel_index(np.argmin(diff, axis=0), diff.shape)
+
+    # Choose a stim level at random within a range around it
+    StimIndex = np.random.choice(a=np.arange(StimIndex[0]-StimSpread,
+                                             StimIndex[0]+StimSpread+1, 1))
+    if StimIndex < 0:
+        StimIndex = 0
+    elif StimIndex > len(StimLevels)-1:
+        StimIndex = len(StimLevels)-1
+
+    return StimIndex
+
+
+# Define an adaptive track measuring the threshold of a single condition
+class AdaptiveTrack():
+    def __init__(self, StimLevels, Gamma, Lambda, typef, MinTrials, MaxTrials, condition=None):
+        self.StimLevels = StimLevels
+        self.Gamma = Gamma
+        self.Lambda = Lambda
+        self.typef = typef
+        self.MinTrials = MinTrials
+        self.MaxTrials = MaxTrials
+        self.condition = condition if condition is not None else {}
+
+        # Data and fit state of the track
+        self.counter = 0
+        self.NumCorrect = np.zeros(len(StimLevels))
+        self.Total = np.zeros(len(StimLevels))
+        self.results = None
+        self.alpha = None
+        self.gain = self.prior_variance()
+
+    def name(self):
+        return ", ".join(key + "=" + str(value) for key, value in self.condition.items())
+
+    def finished(self):
+        return self.counter >= self.MaxTrials
+
+    def fitted(self):
+        return self.results is not None and self.results.success
+
+    def next_stim_index(self):
+        # Choose next stimulus intensity randomly for the first few trials
+        if self.counter < self.MinTrials:
+            return RandomStimIndex(self.StimLevels)
+
+        # Use entropy's maximum likelihood value if the search terminates
+        # succesfully otherwise choose next stimulus intensity at random
+        if self.fitted():
+            return StimIndexAroundAlpha(self.StimLevels, self.results.x[0])
+        return RandomStimIndex(self.StimLevels)
+
+    def update(self, StimIndex, correct):
+        # Store response (correct = 1, 0 or 0.5 for equal stimuli)
+        self.counter += 1
+        self.Total[StimIndex] += 1
+        self.NumCorrect[StimIndex] += correct
+
+        # Present values by Psi method: fitting PF to the data collected so
+        # far taking the estimate PF as the posterior probability
+        if self.counter >= self.MinTrials:
+            self.results = MLE_search(self.Gamma, self.Lambda, self.typef,
+                                      self.StimLevels, self.NumCorrect, self.Total)
+            if self.fitted():
+                self.alpha = self.results.x[0]
+        self.gain = self.expected_gain()
+
+    def prior_variance(self):
+        # Variance of alpha uniformly distributed over the stimulus levels
+        span = np.max(self.StimLevels) - np.min(self.StimLevels)
+        return max(span, 1)**2/12
+
+    def expected_gain(self):
+        # Tracks in the warm-up are given the highest gain
+        var0 = self.prior_variance()
+        if self.counter < self.MinTrials:
+            return var0
+
+        # Trials presented within a range around the last valid threshold
+        # estimate carry most of the information about alpha
+        if self.alpha is None:
+            num_near = self.counter
+        else:
+            ind = np.argmin(abs(self.StimLevels-self.alpha))
+            num_near = np.sum(self.Total[max(0, ind-StimSpread):ind+StimSpread+1])
+
+        # Reduction of the variance of alpha, taken as inversely proportional
+        # to the number of trials near the threshold
+        return var0/(1+num_near) - var0/(2+num_near)
+
+
+def ChooseNextTrack(tracks):
+
+    # Unfinished track chosen at random with a probability proportional to
+    # its expected gain, so that tracks are interleaved unpredictably
+    active = [track for track in tracks if not track.finished()]
+    if not active:
+        return None
+    gains = [track.gain for track in active]
+    if not np.sum(gains) > 0:
+        return random.choice(active)
+
+    return random.choices(active, weights=gains)[0]
+
+
+def TracksBenchmark(num_tracks=(1, 2, 4, 8, 16), MaxTrials=40, MinTrials=9):
+
+    # Simulated users with a different threshold for each track
+    StimLevels = np.arange(0, 15, 1)
+
+    print("{:>8}{:>10}{:>20}{:>20}".format("tracks", "trials", "mean time (ms)", "max time (ms)"))
+
+    for n in num_tracks:
+        users = [PsychometricFunction(Alpha=3+i%5, Beta=1.5, Gamma=0.5, Lambda=0.01)
+                 for i in range(n)]
+        tracks = [AdaptiveTrack(StimLevels, 0.5, 0.01, "Logistic", MinTrials, MaxTrials)
+                  for i in range(n)]
+
+        # Time of the track selection, stimulus selection and fitting of each trial
+        times = []
+        while True:
+            start = time.perf_counter()
+            track = ChooseNextTrack(tracks)
+            if track is None:
+                break
+            StimIndex = track.next_stim_index()
+            user = users[tracks.index(track)]
+            correct = 1 if random.random() <= user.PF(StimLevels[StimIndex]) else 0
+            track.update(StimIndex, correct)
+            times.append(time.perf_counter() - start)
+
+        print("{:>8}{:>10}{:>20.2f}{:>20.2f}".format(
+              n, len(times), 1e3*np.mean(times), 1e3*np.max(times)))
+
+#TracksBenchmark()
@@ -16,7 +16,7 @@ from matplotlib import animation
 
 import random
 from PsychometricFunctionClass import PsychometricFunction
-from MaxLikelihoodEstimation import MLE_search
+from AdaptiveSelection import AdaptiveTrack
 
 # Define user
 user_threshold = 5
@@ -37,10 +37,10 @@ Gamma = test_gamma
 Lambda = lapse_error
 #MaxConsecutive = 2
 
-# Initialise test
-trials_counter = 0
-NumCorrect = np.zeros(len(StimLevels))
-Total = np.zeros(len(StimLevels))
+# Initialise test: a single adaptive track
+track = AdaptiveTrack(StimLevels, Gamma, Lambda, typef, MinTrials, MaxTrials)
+NumCorrect = track.NumCorrect
+Total = track.Total
 stim = []
 
 
@@ -51,51 +51,33 @@ alpha = []
 beta = []
 
 # Trial loop
-while (trials_counter < MaxTrials):
-    trials_counter += 1
+while not track.finished():
 
-    if trials_counter<= MinTrials:
-        # Choose next stimulus intensity randomly
-        StimIndex = random.choice(range(len(StimLevels)))
-
-    else:
-        
-        # Present values by Psi method: 
-        # fitting PF taking the estimate PF as the posterior probability
-        results = MLE_search(Gamma, Lambda, typef, StimLevels, NumCorrect, Total)
-        alpha.append(results.x[0])
-        beta.append(results.x[1])        
-        print("alpha = ", results.x[0], " ; beta = ", results.x[1])
-        
-        # Find stimulus level closest to alpha and set as current
-        diff = abs(StimLevels-results.x[0])
-        StimIndex = np.unravel_index(np.argmin(diff, axis=0), diff.shape)
-        StimIndex = np.random.choice(a=np.arange(StimIndex[0]-2,StimIndex[0]+3,1))
-        if StimIndex < 0:
-            StimIndex = 0
-        elif StimIndex > len(StimLevels)-1:
-            StimIndex = len(StimLevels)-1
-            
+    # Choose next stimulus intensity by the adaptive method
+    StimIndex = track.next_stim_index()
 
     # Current Stimulus level by obtained index
     StimCurrent = StimLevels[StimIndex]
     print("Current stimulus: ", StimCurrent) # Print
     stim.append(StimCurrent)                # Store
     
-    # Increment number of total stimuli for the current level
-    Total[StimIndex] += 1
-        
     # Simulate user response
     # User PF value at current stimulus level
     pCurrent = PF_user.PF(StimCurrent)
     # Record a correct response with a random chance
     # equal to the value of the PF at that stimulus level
-    if random.random() <= pCurrent:
-        NumCorrect[StimIndex] += 1
+    correct = 1 if random.random() <= pCurrent else 0
+    
+    # Update data and fit of the track
+    track.update(StimIndex, correct)
+    if track.results is not None:
+        alpha.append(track.results.x[0])
+        beta.append(track.results.x[1])        
+        print("alpha = ", track.results.x[0], " ; beta = ", track.results.x[1])
         
     # Save data for progress animation
-    total[trials_counter-1,:] = Total
-    numcorrect[trials_counter-1,:] = NumCorrect
+    total[track.counter-1,:] = Total
+    numcorrect[track.counter-1,:] = NumCorrect
         
 
 # Print results
@@ -151,8 +133,11 @@ def init():
 
 # Define update function for each frame of the animation
 def update(frame):
+    # Trial at which the PF of the frame was estimated
+    frame_trial = int(np.ceil(MinTrials)) + frame
+    
     # Measured points update
-    sc.set_data(StimLevels, numcorrect[frame,:]/total[frame,:])
+    sc.set_data(StimLevels, numcorrect[frame_trial-1,:]/total[frame_trial-1,:])
     
     # Estimate PF update
     xdata = np.linspace(StimLevels[0],StimLevels[-1],100)
@@ -161,7 +146,6 @@ def update(frame):
     ln.set_data(xdata,ydata)
     
     # Trial number count annottaion update
-    frame_trial = round(MinTrials) + frame
     str_ann = str(frame_trial) + '/' + str(MaxTrials)
     annotation.set_text(str_ann)
 
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:58:44 2026
+
+Measurement of the import time of the core modules (PF evaluation, fitting,
+adaptive selection and analysis). Each module is imported in a fresh interpreter
+without a display, and it is checked that matplotlib and tkinter are not loaded
+so that worker processes do not pay their start-up cost.
+
+@author: Marina Torrente Rodriguez
+"""
+
+import os
+import subprocess
+import sys
+
+# Modules that must be importable without plotting nor GUI libraries
+CORE_MODULES = ("PsychometricFunctionClass", "MaxLikelihoodEstimation",
+                "AdaptiveSelection", "ModelComparison", "PosteriorGrid")
+
+# Code run in the fresh interpreter to time the import of a module
+IMPORT_CODE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("matplotlib", "tkinter", "pynverse") if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def MeasureImportTime(module, repeats=5):
+
+    # Run without a display so that any GUI import would be noticed
+    env = dict(os.environ)
+    env.pop("DISPLAY", None)
+    env.pop("MPLBACKEND", None)
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", IMPORT_CODE.format(module=module)],
+                                cwd=here, env=env, capture_output=True, text=True,
+                                check=True).stdout.split()
+        times.append(float(output[0]))
+    heavy = output[1] if len(output) > 1 else ""
+
+    # Best time is the least affected by other processes
+    return min(times), heavy
+
+
+def MeasureCoreImportTime(repeats=5):
+
+    print("{:<28}{:>16}   {}".format("Module", "Import time (s)", "Heavy modules loaded"))
+    for module in CORE_MODULES:
+        elapsed, heavy = MeasureImportTime(module, repeats)
+        print("{:<28}{:>16.3f}   {}".format(module, elapsed, heavy or "none"))
+
+
+if __name__ == "__main__":
+    MeasureCoreImportTime()
@@ -37,6 +37,20 @@ The effect of this modification and the method's performance can be tested using
 script AdaptiveTest_UserSimulation.py. The test parameters can be manipulated to 
 see the effect in order to design a suitable experiment depending on the application.
 
+Several line conditions (width and separation) can be measured in the same 
+session. Each condition is an independent adaptive track with its own data and 
+fitted PF, and the tracks are interleaved at random: the next trial is more 
+likely to be presented in the track whose threshold estimate gains the most 
+from another trial (see the script AdaptiveSelection.py).
+
+The timing of each trial is measured with a monotonic high-resolution clock: the 
+onset of the stimulus (once the canvas has been redrawn), the blank interval 
+between trials, the first selection of a line (response) and the press of the 
+Next button (confirmation). The next stimulus is calculated while the lines 
+are hidden so that the fitting time is absorbed by the blank interval. The 
+reaction times, confirmation times and the presentation latency (deviation of 
+the blank interval from its target value) are stored with the per-trial data.
+
 At the end of the experiment, the test subject can view his/her results and 
 fitted psychometric function
 
@@ -62,18 +76,24 @@ TO DOs:
 import tkinter as tk
 import random
 import numpy as np
-from MaxLikelihoodEstimation import MLE_search
+from AdaptiveSelection import AdaptiveTrack, ChooseNextTrack
 from PsychometricFunctionClass import PsychometricFunction
 import time
 
 # Threshold measurements varaibles
 # Test parameters
-MaxTrials = 30                  # After which the test stops
+MaxTrials = 30                  # Per line condition, after which the condition stops
 MinTrials = 0.30*MaxTrials      # Stimuli intensity for the first number of trials is presented at random
 StimLevels = np.arange(0,15,1)  # Array of stimulus intensity levels
 Gamma = 0.5                     # Depends on the type of test; the M-Force Choice methods Gamma = 1/M
 Lambda = 0.01                   # If not known from experience, this is usually set to 0.01 
 typef = "Logistic"              # Maximum number of time the same value of stimulus intensity can be presented consecutively
+BlankInterval = 0.2             # Time the lines are hidden between trials (s)
+LatencyBudget = 0.01            # Maximum accepted presentation latency (s)
+
+# Line conditions measured in interleaved adaptive tracks (in pixels)
+Conditions = [{"width": 1, "separation": 200},
+              {"width": 3, "separation": 200}]
 
 
 def NewLinesLengths(size_base, size_add):
@@ -91,108 +111,165 @@ def NewLinesLengths(size_base, size_add):
         
     return size_lineA, size_lineB
 
-def LinesCoordinates(size_line):
+def LinesCoordinates(size_line, x=None):
     # Generate vertical and horizontal coordinates in the midle of the canvas
     # base on the length of the line
+    if x is None:
+        x = canvas_width/2
     y1 = (canvas_height-size_line)/2
     y2 = y1 + size_line
-    coord = (canvas_width/2, y1, canvas_width/2, y2)
+    coord = (x, y1, x, y2)
     return coord
 
 
-def InitialiseLines(size_base):
-    
-    # Random choice of stimuli levels is assigned as the additional length of one 
-    # of the presented lines
-    size_lineA, size_lineB = NewLinesLengths(size_base, np.random.choice(StimLevels))
-    
-    # Save lines length values in array
-    lineA_length.append(size_lineA)
-    lineB_length.append(size_lineB)
+def LinesPositions(separation):
+    # Horizontal position of lines A and B in their canvas so that they are
+    # 'separation' pixels apart
+    shift = (lines_distance - separation)/2
+    return canvas_width/2 + shift, canvas_width/2 - shift
+
+
+def CheckConditions():
+    # Lines must be fully drawn inside their canvas for every condition,
+    # otherwise the trials would not be presented at the condition's separation
+    for condition in Conditions:
+        max_shift = canvas_width/2 - condition["width"]
+        min_separation = lines_distance - 2*max_shift
+        max_separation = lines_distance + 2*max_shift
+        if not min_separation <= condition["separation"] <= max_separation:
+            raise ValueError("Separation of condition " + str(condition) + 
+                             " out of range: it must be between " + str(min_separation) +
+                             " and " + str(max_separation) + " pixels")
+
+
+def InitialiseLines():
     
-    # Draw lines on Canvas A and B
-    lineA = canvasA.create_line(LinesCoordinates(size_lineA))
-    lineB = canvasB.create_line(LinesCoordinates(size_lineB))
+    # Draw hidden lines on Canvas A and B
+    lineA = canvasA.create_line(LinesCoordinates(0))
+    lineB = canvasB.create_line(LinesCoordinates(0))
     
     return lineA, lineB
 
 
+def SetResponseState(state):
+    
+    # Enable or disable the A/B selection and the Next button
+    selectA.config(state=state)
+    selectB.config(state=state)
+    btn_next.config(state=state)
+
+
 def HideLines():
 
     # Give lines length '0'
     canvasA.coords(lineA, LinesCoordinates(0)) 
     canvasB.coords(lineB, LinesCoordinates(0))
+    
+    # No responses are accepted while the lines are hidden, so that a double 
+    # click on Next does not confirm the following trial before it is shown
+    SetResponseState(tk.DISABLED)
 
-    # Add delay for lines to hide before new lines are presented
+    # Redraw canvas and time the start of the blank interval
     root.update()
-    time.sleep(0.2)
+    
+    return time.perf_counter()
 
 
-def GetNextLengths():
+def WaitBlankInterval(blank_onset):
     
-    # Choose next stimulus intensity randomly for the first few trials
-    if root.counter < MinTrials: 
-        # Choose next stimulus intensity randomly
-        StimIndex = random.choice(range(len(StimLevels)))
-        
-        
-    else:            
-        # Present values by Psi method: 
-        # fitting PF taking the estimate PF as the posterior probablity
-        results = MLE_search(Gamma, Lambda, typef, StimLevels, NumCorrect, Total)
-        
-        # Use entropy's maximum likelihood value if the search terminates 
-        # succesfully otherwise choose next stimulus intensity at random
-        if results.success is True:
-            # Print PF parameters found
-            alpha, beta = results.x[0], results.x[1]
-            print("alpha = ", alpha, " ; beta = ", beta)
-            
-            # Find stim level closest to alpha and set as current 
-            diff = abs(StimLevels-results.x[0])
-            StimIndex = np.unravel_index(np.argmin(diff, axis=0), diff.shape)
-            StimIndex = np.random.choice(a=np.arange(StimIndex[0]-2,StimIndex[0]+3,1))
-            if StimIndex < 0:
-                StimIndex = 0
-            elif StimIndex > len(StimLevels)-1:
-                StimIndex = len(StimLevels)-1
+    # Add delay for lines to hide before new lines are presented, discounting 
+    # the time already spent since the lines were hidden
+    remaining = BlankInterval - (time.perf_counter() - blank_onset)
+    if remaining > 0:
+        time.sleep(remaining)
 
-        else:
-            # Choose next stimulus intensity at random
-            StimIndex = random.choice(range(len(StimLevels)))
+
+def GetNextLengths():
+    
+    # Choose next track and its stimulus intensity by the adaptive method
+    track = ChooseNextTrack(tracks)
+    StimIndex = track.next_stim_index()
+    
+    # Print PF parameters found
+    if track.fitted():
+        print(track.name(), ": alpha = ", track.results.x[0], " ; beta = ", track.results.x[1])
 
     # Current Stimulus level by obtained index
     size_add = StimLevels[StimIndex]
+    size_lineA, size_lineB = NewLinesLengths(size_base, size_add)
 
-    return NewLinesLengths(size_base, size_add)
+    return size_lineA, size_lineB, track
 
    
-def PresentNextLines():
-
-    # Get next lines lengths values according to adaptive method
-    size_lineA, size_lineB = GetNextLengths()
+def PresentNextLines(size_lineA, size_lineB, track):
 
-    # Store new lengths values                
+    # Discard the clicks queued while the lines were hidden, the buttons are 
+    # still disabled
+    root.update()
+    
+    # Store new lengths values and track presented
     lineA_length.append(size_lineA)
     lineB_length.append(size_lineB)
+    track_index.append(tracks.index(track))
     
-    # Update lines A and B lengths
-    canvasA.coords(lineA, LinesCoordinates(size_lineA)) 
-    canvasB.coords(lineB, LinesCoordinates(size_lineB)) 
+    # Update lines A and B lengths, position and width
+    xA, xB = LinesPositions(track.condition["separation"])
+    canvasA.coords(lineA, LinesCoordinates(size_lineA, xA)) 
+    canvasB.coords(lineB, LinesCoordinates(size_lineB, xB)) 
+    canvasA.itemconfig(lineA, width=track.condition["width"])
+    canvasB.itemconfig(lineB, width=track.condition["width"])
     
     # Deselect A/B radiobuttons#
     selectA.deselect()
     selectB.deselect()
+    root.selection_time = None
+    
+    # Redraw canvas and time the stimulus onset
+    root.update_idletasks()
+    onset = time.perf_counter()
+    
+    # Accept responses once the lines are shown
+    SetResponseState(tk.NORMAL)
+    
+    return onset
+
+
+def RecordPresentationTiming(blank_onset, onset):
+    
+    # Store stimulus onset, blank interval and presentation latency
+    stim_onset.append(onset)
+    blank_interval.append(onset - blank_onset)
+    presentation_latency.append(blank_interval[-1] - BlankInterval)
+    
+    # Warn if the lines were presented later than accepted
+    if presentation_latency[-1] > LatencyBudget:
+        print("Warning: presentation latency", presentation_latency[-1],
+              "s exceeds the budget of", LatencyBudget, "s")
+
+
+def PrintTimingSummary():
+    
+    # Reaction times
+    print("Reaction time: mean =", np.mean(reaction_time), 
+          "s ; std =", np.std(reaction_time), "s")
+    print("Confirmation time: mean =", np.mean(confirm_time), 
+          "s ; std =", np.std(confirm_time), "s")
+    
+    # Presentation latency and jitter (not defined for the first trial)
+    latency = np.array(presentation_latency)
+    latency = latency[np.isfinite(latency)]
+    if latency.size:
+        print("Presentation latency: mean =", np.mean(latency),
+              "s ; max =", np.max(latency),
+              "s ; jitter (std) =", np.std(latency), "s")
+        print("Trials over latency budget:", np.sum(latency > LatencyBudget))
 
 
 def UpdateResultsVariablesByChoice():
     
     # Find index of stimulus
     stimulus_value = abs(lineA_length[-1]-lineB_length[-1])
-    stimulus_index = np.where(StimLevels == stimulus_value)
-    
-    # Increment the total number of stimulus intensity presented
-    Total[stimulus_index] += 1
+    stimulus_index = np.where(StimLevels == stimulus_value)[0][0]
     print(stimulus_value)
     
     # Determine correct or incorrect response
@@ -203,11 +280,16 @@ def UpdateResultsVariablesByChoice():
     else:
         correct = 'Equal'
             
-    # Increment number of correct responses if required
+    # Number of correct responses to add
     if correct == choice[-1]:
-        NumCorrect[stimulus_index] += 1
+        num_correct = 1
     elif correct == 'Equal':
-        NumCorrect[stimulus_index] += 0.5        
+        num_correct = 0.5
+    else:
+        num_correct = 0
+    
+    # Update data and fit of the track presented
+    tracks[track_index[-1]].update(stimulus_index, num_correct)
 
 
 def HideWidgets():
@@ -220,18 +302,33 @@ def HideWidgets():
 
 def PlotResults():
 
-    # Find PF parameters: alpha and beta
-    results = MLE_search(Gamma, Lambda, typef, StimLevels, NumCorrect, Total)
-
-    # Define PF
-    PF = PsychometricFunction(Alpha=results.x[0], Beta=results.x[1],
-                              Gamma=Gamma, Lambda=Lambda, type_func=typef)
-
     # x-axis vector            
     x = np.linspace(np.min(StimLevels),np.max(StimLevels),100)
 
-    # Plot PF and measured points
-    PF.plot_PFestimate(x, StimLevels, NumCorrect, Total)
+    for track in tracks:
+        
+        # Use PF parameters found for the track: alpha and beta
+        if not track.fitted():
+            print(track.name(), ": MLE search not treminated succesfully")
+            continue
+        print(track.name(), ": threshold = ", track.results.x[0])
+        
+        # Define PF
+        PF = PsychometricFunction(Alpha=track.results.x[0], Beta=track.results.x[1],
+                                  Gamma=Gamma, Lambda=Lambda, type_func=typef)
+
+        # Plot PF and measured points
+        PF.plot_PFestimate(x, StimLevels, track.NumCorrect, track.Total,
+                           title=track.name())
+
+
+# Define A/B radiobuttons callback function
+def SelectionCallback():
+    
+    # Time of the response: first selection of a line after the stimulus onset,
+    # later changes of mind are not taken into account
+    if root.selection_time is None:
+        root.selection_time = time.perf_counter()
 
 
 # Define Next button callback function
@@ -246,13 +343,18 @@ def NextCallback():
 
     else:
 
+        # Time of the confirmation
+        confirm = time.perf_counter()
+
         # Hide lines before presenting new lengths to aviodvisual 
         # changes to provide a cue based on a change happening rather 
         # than a difference in length perceived 
-        HideLines()
+        blank_onset = HideLines()
         
         # Store results
         choice.append(Option.get())
+        reaction_time.append(root.selection_time - stim_onset[-1])
+        confirm_time.append(confirm - stim_onset[-1])
         
         # Update reults variable
         UpdateResultsVariablesByChoice()
@@ -262,12 +364,22 @@ def NextCallback():
         print("Line A:",lineA_length)
         print("Line B:",lineB_length)
         print("Choice: ", choice)
+        print("Track:", track_index)
+        print("Reaction time: ", reaction_time[-1])
+        print("Confirmation time: ", confirm_time[-1])
 
-        # If number of trails has not exceed a maximum, 
+        # If number of trails has not exceed a maximum in every track, 
         # then Show next pair of lines
-        if root.counter < MaxTrials:
+        if not all(track.finished() for track in tracks):
             
-            PresentNextLines()
+            # Get next lines lengths values according to adaptive method
+            # while the lines are hidden
+            size_lineA, size_lineB, track = GetNextLengths()
+            
+            # Present next lines once the blank interval has finished
+            WaitBlankInterval(blank_onset)
+            onset = PresentNextLines(size_lineA, size_lineB, track)
+            RecordPresentationTiming(blank_onset, onset)
                                     
         # Otherwise, end program and show results        
         else:
@@ -279,6 +391,9 @@ def NextCallback():
             print("END!")
             intrs_txt.config(text="You have finished the test!")
             
+            # Print timing results
+            PrintTimingSummary()
+            
             # Plot results
             PlotResults()
             
@@ -286,12 +401,21 @@ def NextCallback():
 # Initial varaibles
 root = tk.Tk()
 root.counter = 0
+root.selection_time = None
 choice = []
 stim = []
 lineA_length = []
 lineB_length = []
-NumCorrect = np.zeros(len(StimLevels))
-Total = np.zeros(len(StimLevels))
+stim_onset = []
+reaction_time = []
+confirm_time = []
+blank_interval = []
+presentation_latency = []
+track_index = []
+
+# Independent adaptive track for each line condition
+tracks = [AdaptiveTrack(StimLevels, Gamma, Lambda, typef, MinTrials, MaxTrials, condition)
+          for condition in Conditions]
 
 
 # Intructions text widget
@@ -303,17 +427,16 @@ canvas_height = 500
 canvasA = tk.Canvas(root, width=canvas_width, height=canvas_height)
 canvasB = tk.Canvas(root, width=canvas_width, height=canvas_height)
 
-# Initial lines length based on random choice of stimulus intentity
-size_base = 150 # baseline lines' length
-lineA, lineB = InitialiseLines(size_base)
+# Baseline lines' length
+size_base = 150
 
 # Select buttons
 Option = tk.StringVar()
 selectA = tk.Radiobutton(root, text="A", variable= Option, value="A",
-                         tristatevalue=0,
+                         tristatevalue=0, command=SelectionCallback,
                          font=("Helvetica",15), width=5, pady = 20)
 selectB = tk.Radiobutton(root, text="B", variable= Option, value="B",
-                         tristatevalue=0,
+                         tristatevalue=0, command=SelectionCallback,
                          font=("Helvetica",15), width=5, pady = 20)
             
 # Next button
@@ -331,6 +454,19 @@ btn_next.grid(row=3,column=1)
 
 # Initialise GUI
 root.geometry("600x800")
+root.update()
+
+# Distance between the centres of canvas A and B
+lines_distance = canvasB.winfo_x() - canvasA.winfo_x()
+CheckConditions()
+
+# Initial lines length based on random choice of stimulus intentity
+lineA, lineB = InitialiseLines()
+size_lineA, size_lineB, track = GetNextLengths()
+stim_onset.append(PresentNextLines(size_lineA, size_lineB, track))
+# No blank interval precedes the first trial, one timing record per trial
+blank_interval.append(np.nan)
+presentation_latency.append(np.nan)
 root.mainloop()
 
 
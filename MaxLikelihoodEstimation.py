@@ -12,7 +12,6 @@ from PsychometricFunctionClass import PsychometricFunction
 from scipy.optimize import fsolve
 from scipy.optimize import minimize
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 
@@ -49,7 +48,7 @@ def MLE_search(Gamma, Lambda, type_func, StimLevels, NumCorrect, Total):
                                        type_func=type_func)
             return PF.PF(x1)-y1
         
-        b = fsolve(pf,1)
+        b = fsolve(pf,1)[0]
 
         return [a, b]
     
@@ -60,6 +59,7 @@ def MLE_search(Gamma, Lambda, type_func, StimLevels, NumCorrect, Total):
 
 
 def TestExample(exID):
+    import matplotlib.pyplot as plt
     
     if exID == 1:
         # Example data 1
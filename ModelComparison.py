@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:12:41 2026
+
+Model comparison between the types of psychometric function (Logistic, Weibull
+and Gumbel), optionally with a free lapse rate, fitted to the same measured data.
+The fits are compared by their logarithmic likelihood, the Akaike Information
+Criterion (AIC) and the Bayesian Information Criterion (BIC) so that the type of
+PF that best describes the behaviour of each observer can be identified.
+
+The initial guess of each fit is found by evaluating the likelihood over a
+coarse alpha-beta grid in a single batched numpy operation, which is then refined
+with the 'Nelder-Mead' method. Whole archives of sessions can be compared
+concurrently using a pool of worker processes.
+
+@author: Marina Torrente Rodriguez
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from scipy.optimize import minimize
+from PsychometricFunctionClass import PsychometricFunction, PF_TYPES
+
+# Probabilities are clipped to avoid log(0) in the likelihood
+EPS = 1e-10
+# Maximum lapse rate allowed when the lapse is a free parameter
+MAX_LAPSE = 0.06
+# Criteria available to choose the best model
+CRITERIA = ("AIC", "BIC", "LL")
+
+
+def CheckComparisonData(StimLevels, NumCorrect, Total):
+
+    # Convert data to float arrays
+    try:
+        StimLevels = np.asarray(StimLevels, dtype=float)
+        NumCorrect = np.asarray(NumCorrect, dtype=float)
+        Total = np.asarray(Total, dtype=float)
+    except TypeError:
+        raise ValueError("StimLevels, NumCorrect and Total must be numeric arrays")
+
+    # Check the data is consistent before fitting any model
+    if not (StimLevels.ndim == NumCorrect.ndim == Total.ndim == 1):
+        raise ValueError("StimLevels, NumCorrect and Total must be 1-D arrays")
+    if not (len(StimLevels) == len(NumCorrect) == len(Total)):
+        raise ValueError("StimLevels, NumCorrect and Total must have the same length")
+    if not (np.all(np.isfinite(StimLevels)) and np.all(np.isfinite(NumCorrect))
+            and np.all(np.isfinite(Total))):
+        raise ValueError("StimLevels, NumCorrect and Total must be finite")
+    if np.any(NumCorrect < 0) or np.any(NumCorrect > Total):
+        raise ValueError("NumCorrect must be between 0 and Total")
+    if np.sum(Total) <= 0:
+        raise ValueError("No trials in the data")
+
+    # Only stimulus levels that have been presented contribute to the likelihood
+    presented = Total > 0
+
+    return StimLevels[presented], NumCorrect[presented], Total[presented]
+
+
+def LogLikelihood(PF, StimLevels, NumCorrect, Total):
+
+    # Logarithmic likelihood of the data given the PF, the PF parameters may be
+    # arrays so that several PFs are evaluated at once (stimulus as last axis)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        p = np.clip(PF.PF(StimLevels), EPS, 1-EPS)
+        LL = np.sum(NumCorrect*np.log(p) + (Total-NumCorrect)*np.log(1-p), axis=-1)
+
+    # Invalid parameters (e.g. negative Weibull alpha) are given no likelihood
+    return np.where(np.isfinite(LL), LL, -np.inf)
+
+
+def GridInitialGuess(Gamma, Lambda, type_func, StimLevels, NumCorrect, Total, num=25):
+
+    # Coarse grid of alpha and beta values depending on the type of PF
+    lo, hi = np.min(StimLevels), np.max(StimLevels)
+    span = hi - lo if hi > lo else 1.0
+    if type_func == "Weibull":
+        alphas = np.linspace(hi/num, hi, num)
+        betas = np.logspace(-1, 1.5, num)
+    else:
+        alphas = np.linspace(lo, hi, num)
+        betas = np.logspace(-1, 3, num) / span
+        if type_func == "Gumbel":
+            betas = betas / np.log(10)
+
+    # Likelihood of all the grid points calculated in a single batch
+    PF = PsychometricFunction(Alpha=alphas[:, None, None], Beta=betas[None, :, None],
+                              Gamma=Gamma, Lambda=Lambda, type_func=type_func)
+    LL = LogLikelihood(PF, StimLevels, NumCorrect, Total)
+    ia, ib = np.unravel_index(np.argmax(LL), LL.shape)
+
+    return [alphas[ia], betas[ib]]
+
+
+def FitModel(type_func, Gamma, Lambda, StimLevels, NumCorrect, Total, free_lapse=False):
+
+    # Negative log likelihood with the lapse rate as optional third parameter
+    def NegLL(params):
+        L = params[2] if free_lapse else Lambda
+        PF = PsychometricFunction(Alpha=params[0], Beta=params[1], Gamma=Gamma,
+                                  Lambda=L, type_func=type_func)
+        return -LogLikelihood(PF, StimLevels, NumCorrect, Total)
+
+    # Number of free parameters of the model
+    k = 3 if free_lapse else 2
+    n = np.sum(Total)
+    fit = {"type_func": type_func, "free_lapse": free_lapse, "k": k,
+           "alpha": np.nan, "beta": np.nan, "lambda": Lambda,
+           "LL": -np.inf, "AIC": np.inf, "BIC": np.inf,
+           "success": False, "message": ""}
+
+    # Weibull PF is only defined for positive stimulus levels
+    if type_func == "Weibull" and (np.any(StimLevels < 0) or np.max(StimLevels) <= 0):
+        fit["message"] = "Weibull PF requires non-negative stimulus levels"
+        return fit
+
+    # Batched grid search provides the starting point of the search
+    guess = GridInitialGuess(Gamma, Lambda, type_func, StimLevels, NumCorrect, Total)
+    bounds = [(1e-6, None)]*2 if type_func == "Weibull" else [(None, None)]*2
+    if free_lapse:
+        guess.append(min(max(Lambda, 0.01), MAX_LAPSE))
+        bounds.append((0, MAX_LAPSE))
+
+    results = minimize(NegLL, guess, method='Nelder-Mead', bounds=bounds)
+
+    # Information criteria of the fitted model
+    LL = -results.fun
+    fit.update({"alpha": results.x[0], "beta": results.x[1],
+                "lambda": results.x[2] if free_lapse else Lambda,
+                "LL": LL, "AIC": 2*k - 2*LL, "BIC": k*np.log(n) - 2*LL,
+                "success": bool(results.success) and np.isfinite(LL),
+                "message": results.message})
+
+    return fit
+
+
+def CheckFamilies(families):
+
+    # A single type of PF can be given by its name
+    if isinstance(families, str):
+        families = (families,)
+
+    # Check the requested models before doing any fitting
+    unknown = [f for f in families if f not in PF_TYPES]
+    if unknown or not families:
+        raise ValueError("Psychometric function type not identified: " +
+                         repr(unknown) + " (expected one of " + ", ".join(PF_TYPES) + ")")
+
+    return tuple(families)
+
+
+def CheckComparisonOptions(free_lapse, criterion):
+
+    # Criterion used to choose the best model
+    if criterion not in CRITERIA:
+        raise ValueError("Criterion must be one of " + ", ".join(CRITERIA))
+
+    # Lapse rate options fitted for each type of PF
+    if free_lapse == "both":
+        return [False, True]
+    elif free_lapse in (True, False):
+        return [bool(free_lapse)]
+    raise ValueError("free_lapse must be True, False or 'both'")
+
+
+def CompareModels(Gamma, Lambda, StimLevels, NumCorrect, Total, families=PF_TYPES,
+                  free_lapse=False, criterion="BIC"):
+
+    families = CheckFamilies(families)
+    lapses = CheckComparisonOptions(free_lapse, criterion)
+
+    StimLevels, NumCorrect, Total = CheckComparisonData(StimLevels, NumCorrect, Total)
+
+    # Fit every type of PF to the same data
+    fits = {}
+    for type_func in families:
+        for lapse in lapses:
+            name = type_func + ("+lapse" if lapse else "")
+            fits[name] = FitModel(type_func, Gamma, Lambda, StimLevels,
+                                  NumCorrect, Total, free_lapse=lapse)
+
+    # Best model has the lowest AIC/BIC or the highest log likelihood
+    valid = [name for name in fits if fits[name]["success"]]
+    if criterion == "LL":
+        best = max(valid, key=lambda name: fits[name]["LL"], default=None)
+    else:
+        best = min(valid, key=lambda name: fits[name][criterion], default=None)
+
+    return {"fits": fits, "best": best, "criterion": criterion,
+            "n_trials": np.sum(Total)}
+
+
+def _CompareSession(session, **kwargs):
+
+    # Worker function: bad sessions are reported instead of stopping the archive
+    if not (isinstance(session, (tuple, list)) and len(session) == 3):
+        return {"fits": {}, "best": None,
+                "error": "Session must be a tuple (StimLevels, NumCorrect, Total)"}
+    try:
+        return CompareModels(StimLevels=session[0], NumCorrect=session[1],
+                             Total=session[2], **kwargs)
+    except ValueError as err:
+        return {"fits": {}, "best": None, "error": str(err)}
+
+
+def CompareArchive(sessions, Gamma, Lambda, families=PF_TYPES, free_lapse=False,
+                   criterion="BIC", max_workers=None, chunksize=8):
+
+    # Each session is a tuple (StimLevels, NumCorrect, Total). Sessions are
+    # compared concurrently in worker processes, so scripts on Windows calling
+    # this function need the "if __name__ == '__main__':" guard
+    families = CheckFamilies(families)
+    CheckComparisonOptions(free_lapse, criterion)
+    worker = partial(_CompareSession, Gamma=Gamma, Lambda=Lambda, families=families,
+                     free_lapse=free_lapse, criterion=criterion)
+
+    # Avoid the cost of starting processes when only one worker is requested
+    if max_workers == 1:
+        return [worker(session) for session in sessions]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(worker, sessions, chunksize=chunksize))
+
+
+def PrintComparison(comparison):
+
+    if "error" in comparison:
+        print("Comparison not performed:", comparison["error"])
+        return
+
+    print("{:<16}{:>10}{:>10}{:>8}{:>12}{:>10}{:>10}".format(
+          "Model", "alpha", "beta", "lambda", "LL", "AIC", "BIC"))
+    for name, fit in comparison["fits"].items():
+        print("{:<16}{:>10.4g}{:>10.4g}{:>8.3f}{:>12.4f}{:>10.3f}{:>10.3f}".format(
+              name, fit["alpha"], fit["beta"], fit["lambda"],
+              fit["LL"], fit["AIC"], fit["BIC"]))
+    print("Best model by", comparison["criterion"], ":", comparison["best"])
+
+
+## Use example
+def ComparisonExample():
+
+    # Example data 1 of MaxLikelihoodEstimation.py
+    StimLevels = np.array([0.01, 0.03, 0.05, 0.07, 0.09, 0.11])
+    NumCorrect = np.array([45, 55, 72, 85, 91, 100])
+    Total = np.array([100, 100, 100, 100, 100, 100])
+
+    comparison = CompareModels(Gamma=0.5, Lambda=0, StimLevels=StimLevels,
+                               NumCorrect=NumCorrect, Total=Total, free_lapse="both")
+    PrintComparison(comparison)
+
+#ComparisonExample()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:05:27 2026
+
+Posterior distribution of the parameters of a psychometric function evaluated
+over a 4-D grid of alpha, beta, lambda (lapse rate) and gamma (guess rate) values.
+Marginalizing over the lapse and guess rates avoids the bias in the threshold
+estimate caused by fixing them to a wrong value.
+
+A dense likelihood table of the 4-D grid for every stimulus level is too large
+to be held in memory, so the grid is processed in chunks of alpha-beta pairs
+(and of lambda values when a single pair does not fit) whose size is chosen to
+keep the peak memory under a given budget. The likelihood
+can be stored in float32 and the marginal distributions are accumulated in the
+logarithmic domain (log-sum-exp) to avoid underflow. A uniform prior over the
+grid is assumed.
+
+@author: Marina Torrente Rodriguez
+"""
+
+import time
+import tracemalloc
+import numpy as np
+from PsychometricFunctionClass import PsychometricFunction, PFValues
+from ModelComparison import CheckComparisonData
+
+# Default memory budget for the likelihood of a chunk (bytes). The alpha-beta
+# pairs and their marginal distribution (a few values per pair) are not chunked
+MAX_BYTES = 64*2**20
+# Number of full-size temporary arrays created while evaluating a chunk
+CHUNK_TEMPORARIES = 4
+
+
+def LogSumExp(a, axis=None):
+
+    # Logarithm of the sum of exponentials computed without underflow and
+    # keeping the data type of the input array
+    m = np.max(a, axis=axis, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0)
+    # Slices with all values -inf result in log(0) = -inf
+    with np.errstate(divide='ignore'):
+        s = np.log(np.sum(np.exp(a - m), axis=axis, keepdims=True)) + m
+
+    if axis is None:
+        return s.reshape(())
+    return np.squeeze(s, axis=axis)
+
+
+def ChunkSize(num_lambda, num_gamma, num_stim, dtype=np.float32, max_bytes=MAX_BYTES):
+
+    # Memory required by the gamma values of each alpha-beta pair and lambda value
+    row_bytes = CHUNK_TEMPORARIES * num_gamma * num_stim * np.dtype(dtype).itemsize
+    if row_bytes > max_bytes:
+        raise ValueError("max_bytes must be at least " + str(row_bytes) +
+                         " bytes to evaluate the gamma values of a single grid point")
+    rows = int(max_bytes // row_bytes)
+
+    # Number of alpha-beta pairs and lambda values of each chunk: the lambda
+    # axis is only split when a single alpha-beta pair does not fit
+    if rows >= num_lambda:
+        return rows // num_lambda, num_lambda
+    return 1, rows
+
+
+def ChunkedPosterior(StimLevels, NumCorrect, Total, AlphaGrid, BetaGrid, LambdaGrid,
+                     GammaGrid, type_func="Logistic", dtype=np.float32, max_bytes=MAX_BYTES):
+
+    # Only stimulus levels presented contribute to the likelihood
+    StimLevels, NumCorrect, Total = CheckComparisonData(StimLevels, NumCorrect, Total)
+    x = StimLevels.astype(dtype)
+    k = NumCorrect.astype(dtype)
+    nk = (Total - NumCorrect).astype(dtype)
+    eps = np.finfo(dtype).eps
+
+    # Parameter grids: alpha-beta pairs are flattened and processed in chunks
+    AlphaGrid = np.asarray(AlphaGrid, dtype=dtype)
+    BetaGrid = np.asarray(BetaGrid, dtype=dtype)
+    LambdaGrid = np.asarray(LambdaGrid, dtype=dtype)
+    GammaGrid = np.asarray(GammaGrid, dtype=dtype)
+    A, B = [g.ravel() for g in np.meshgrid(AlphaGrid, BetaGrid, indexing='ij')]
+    L = LambdaGrid[None, :, None, None]
+    G = GammaGrid[None, None, :, None]
+
+    # Lapse and guess rates must leave room for the PF to increase
+    valid = (LambdaGrid[:, None] + GammaGrid[None, :]) < 1
+    if not valid.any():
+        raise ValueError("Lambda + Gamma must be lower than 1 for at least one "
+                         "pair of LambdaGrid and GammaGrid values")
+
+    chunk, chunk_lambda = ChunkSize(len(LambdaGrid), len(GammaGrid), len(x), dtype, max_bytes)
+
+    # Logarithmic marginals accumulated chunk by chunk
+    logAB = np.full(len(A), -np.inf)
+    logL = np.full(len(LambdaGrid), -np.inf)
+    logG = np.full(len(GammaGrid), -np.inf)
+
+    for i0 in range(0, len(A), chunk):
+        i1 = min(i0 + chunk, len(A))
+        for l0 in range(0, len(LambdaGrid), chunk_lambda):
+            l1 = min(l0 + chunk_lambda, len(LambdaGrid))
+
+            # PF of every grid point in the chunk (stimulus levels as last axis)
+            with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+                p = PFValues(x, A[i0:i1, None, None, None], B[i0:i1, None, None, None],
+                             G, L[:, l0:l1], type_func)
+                np.nan_to_num(p, copy=False, nan=eps)
+                np.clip(p, eps, 1-eps, out=p)
+
+                # Logarithmic likelihood of the chunk: (pairs, lambda, gamma)
+                LL = np.log(p) @ k + np.log1p(-p) @ nk
+            del p
+            LL = np.where(valid[l0:l1], LL, -np.inf).astype(dtype, copy=False)
+
+            logAB[i0:i1] = np.logaddexp(logAB[i0:i1], LogSumExp(LL, axis=(1, 2)))
+            logL[l0:l1] = np.logaddexp(logL[l0:l1], LogSumExp(LL, axis=(0, 2)))
+            logG = np.logaddexp(logG, LogSumExp(LL, axis=(0, 1)))
+
+    # Normalise the marginal distributions
+    logZ = LogSumExp(logAB)
+    post_AB = np.exp(logAB - logZ).reshape(len(AlphaGrid), len(BetaGrid))
+    marginals = {"alpha": np.sum(post_AB, axis=1),
+                 "beta": np.sum(post_AB, axis=0),
+                 "lambda": np.exp(logL - logZ),
+                 "gamma": np.exp(logG - logZ)}
+    grids = {"alpha": AlphaGrid, "beta": BetaGrid,
+             "lambda": LambdaGrid, "gamma": GammaGrid}
+
+    # Posterior mean and mode of each parameter
+    mean = {name: float(np.sum(grids[name] * marginals[name])) for name in grids}
+    mode = {name: float(grids[name][np.argmax(marginals[name])]) for name in grids}
+
+    return {"marginals": marginals, "alpha_beta": post_AB, "mean": mean, "mode": mode,
+            "log_evidence": float(logZ), "chunk_size": (chunk, chunk_lambda),
+            "num_chunks": int(np.ceil(len(A) / chunk) * np.ceil(len(LambdaGrid) / chunk_lambda))}
+
+
+def PosteriorBenchmark(sizes=(20, 40, 80, 160), num_lambda=10, num_gamma=5,
+                       dtype=np.float32, max_bytes=MAX_BYTES):
+
+    # Simulated observer data
+    StimLevels = np.arange(0, 15, 1)
+    Total = 20*np.ones(len(StimLevels))
+    PF_user = PsychometricFunction(Alpha=5, Beta=1, Gamma=0.5, Lambda=0.02)
+    NumCorrect = np.random.binomial(Total.astype(int), PF_user.PF(StimLevels))
+
+    print("{:>10}{:>14}{:>10}{:>14}{:>12}{:>12}{:>14}".format(
+          "alpha/beta", "grid points", "time (s)", "Mpoints/s",
+          "peak (MB)", "budget (MB)", "dense (MB)"))
+
+    for n in sizes:
+        AlphaGrid = np.linspace(0, 15, n)
+        BetaGrid = np.logspace(-1, 1, n)
+        LambdaGrid = np.linspace(0, 0.1, num_lambda)
+        GammaGrid = np.linspace(0.4, 0.6, num_gamma)
+        num_points = n * n * num_lambda * num_gamma
+
+        # Measure time and peak memory of the posterior evaluation
+        tracemalloc.start()
+        start = time.perf_counter()
+        posterior = ChunkedPosterior(StimLevels, NumCorrect, Total, AlphaGrid, BetaGrid,
+                                     LambdaGrid, GammaGrid, dtype=dtype, max_bytes=max_bytes)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # Size of the dense float64 likelihood table for every stimulus level
+        dense = num_points * len(StimLevels) * 8
+
+        print("{:>10}{:>14}{:>10.3f}{:>14.2f}{:>12.1f}{:>12.1f}{:>14.1f}".format(
+              n, num_points, elapsed, num_points/elapsed/1e6,
+              peak/2**20, max_bytes/2**20, dense/2**20))
+
+    return posterior
+
+#PosteriorBenchmark()
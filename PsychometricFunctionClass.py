@@ -10,10 +10,30 @@ several type of PFs, plotting the results and calculating the inverse values
 
 
 
-# Import required libraries
+# Import required libraries (pynverse and matplotlib are only imported when
+# the inverse PF or the plots are required to keep the import fast)
 import numpy as np
-from pynverse import inversefunc
-import matplotlib.pyplot as plt
+
+# Types of psychometric function that can be calculated
+PF_TYPES = ("Logistic", "Weibull", "Gumbel")
+
+
+# Value of a PF at the stimulus intensities x; the parameters may be arrays
+# that are broadcast against x to evaluate several PFs at once
+def PFValues(x, Alpha, Beta, Gamma, Lambda, type_func="Logistic"):
+
+    if type_func == "Logistic":
+        return Gamma+ (1-Gamma-Lambda) * (1 / (1 + np.exp(-Beta*(x-Alpha))))
+    
+    elif type_func == "Weibull":
+        return Gamma+ (1-Gamma-Lambda) * (1 - np.exp(-((x/Alpha)**Beta)))
+        
+    elif type_func == "Gumbel":
+        return Gamma+ (1-Gamma-Lambda) * (1 - np.exp(-10**(Beta*(x-Alpha))))
+        
+    raise ValueError("Psychometric function type not identified: " + 
+                     repr(type_func) + " (expected one of " + 
+                     ", ".join(PF_TYPES) + ")")
 
 # Define a Psychometric Function class of default type Logistic
 class PsychometricFunction():
@@ -25,24 +45,23 @@ class PsychometricFunction():
         self.type_func = type_func
         
 
-        if self.type_func == "Logistic":
-            self.PF = lambda x: self.Gamma+ (1-self.Gamma-self.Lambda) * (1 / (1 + np.exp(-self.Beta*(x-self.Alpha))))
-        
-        elif self.type_func == "Weibull":
-            self.PF = lambda x: self.Gamma+ (1-self.Gamma-self.Lambda) * (1 - np.exp(-((x/self.Alpha)**self.Beta)))
-            
-        elif self.type_func == "Gumbel":
-            self.PF = lambda x: self.Gamma+ (1-self.Gamma-self.Lambda) * (1 - np.exp(-10**(self.Beta*(x-self.Alpha)))) 
+        if self.type_func in PF_TYPES:
+            self.PF = lambda x: PFValues(x, self.Alpha, self.Beta, self.Gamma,
+                                         self.Lambda, self.type_func)
             
         else:
-            print("Error: Psychometric function type not identified!")
+            raise ValueError("Psychometric function type not identified: " + 
+                             repr(self.type_func) + " (expected one of " + 
+                             ", ".join(PF_TYPES) + ")")
                     
             
         if inv:
+            from pynverse import inversefunc
             self.invPF = lambda y: inversefunc(self.PF, y_values=y)
         
     
     def plot_PF(self, start, end, num_points, title=""):
+        import matplotlib.pyplot as plt
         x = np.linspace(start, end, num=num_points)
 #        plt.figure()
         plt.plot(x,self.PF(x))
@@ -51,7 +70,8 @@ class PsychometricFunction():
         plt.grid()
         plt.show()
         
-    def plot_PFestimate(self, x, stimilus_levels, correct_responses, total):
+    def plot_PFestimate(self, x, stimilus_levels, correct_responses, total, title=""):
+        import matplotlib.pyplot as plt
         plt.figure()
         plt.scatter(stimilus_levels, correct_responses/total, s=2*total)
         plt.plot(x,self.PF(x))
@@ -59,12 +79,14 @@ class PsychometricFunction():
         plt.ylabel("Probability of Correct Response")
         plt.xlabel("Stimulus Intensity")
         plt.legend(["Measured behaviour", "Estimate PF"])
+        plt.title(title)
         plt.ylim(-0.1,1.1)
 
         
 
 ## Use example
 def PFexample():
+    import matplotlib.pyplot as plt
         
     # Create an element class
     myPF = PsychometricFunction(Alpha=1, Beta=3, Gamma=0.5, Lambda=0.01,